@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+
+from app.core.security import require_metrics_token
+from app.schemas.metrics import AuditMetricsResponse
+from app.services.audit_service import audit_writer
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+
+
+@router.get("/audit", response_model=AuditMetricsResponse)
+async def audit_metrics() -> AuditMetricsResponse:
+    return AuditMetricsResponse.model_validate(audit_writer.metrics())
@@ -7,6 +7,12 @@ from app.core.security import get_current_user
 from app.db.session import get_database
 from app.schemas.auth import LogoutResponse
 from app.schemas.profile import ProfileResponse, ProfileUpdate
+from app.services.audit_service import (
+    AUDIT_PROFILE_DELETED,
+    AUDIT_PROFILE_READ,
+    AUDIT_PROFILE_UPDATED,
+    audit_writer,
+)
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/profile", tags=["profile"])
@@ -15,6 +21,7 @@ _user_service = UserService()
 
 @router.get("/me", response_model=ProfileResponse)
 async def read_profile(current_user: dict = Depends(get_current_user)) -> ProfileResponse:
+    await audit_writer.record(AUDIT_PROFILE_READ, user_id=current_user["id"])
     return ProfileResponse.model_validate(current_user)
 
 
@@ -27,6 +34,11 @@ async def update_profile(
     user = await _user_service.update_user(db, current_user["id"], payload)
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await audit_writer.record(
+        AUDIT_PROFILE_UPDATED,
+        user_id=current_user["id"],
+        fields=sorted(payload.model_dump(exclude_unset=True)),
+    )
     return ProfileResponse.model_validate(user)
 
 
@@ -38,4 +50,5 @@ async def delete_profile(
     deleted = await _user_service.delete_user(db, current_user["id"])
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await audit_writer.record(AUDIT_PROFILE_DELETED, user_id=current_user["id"])
     return LogoutResponse(detail="Account deleted")
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import zlib
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli as _brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    _brotli = None
+
+try:
+    import zstandard as _zstd  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    _zstd = None
+
+_COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "application/octet-stream",
+)
+_EXCLUDED_TYPES = ("text/event-stream",)
+# Responses that must not carry a body, so there is nothing to encode
+_BODYLESS_STATUSES = (204, 304)
+
+# Server preference when the client weights several encodings equally
+_PREFERRED_ORDER = ("zstd", "br", "gzip")
+
+
+class CompressionStream(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality: int) -> None:
+        self._compressor = _brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, codec: _ZstdCodec, context: object) -> None:
+        self._codec = codec
+        self._context = context
+        self._compressor = context.compressobj()  # type: ignore[attr-defined]
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(_zstd.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        body = self._compressor.flush(_zstd.COMPRESSOBJ_FLUSH_FINISH)
+        self._codec.release(self._context)
+        return body
+
+
+class _ZstdCodec:
+    """Keeps zstd contexts alive across responses instead of allocating one per request.
+
+    A context can only drive one stream at a time, so concurrent streaming
+    responses each take their own context from the pool.
+    """
+
+    def __init__(self, level: int, pool_size: int = 8) -> None:
+        self.level = level
+        self.pool_size = pool_size
+        self._idle: list[object] = []
+
+    def open(self) -> _ZstdStream:
+        context = self._idle.pop() if self._idle else _zstd.ZstdCompressor(level=self.level)
+        return _ZstdStream(self, context)
+
+    def release(self, context: object) -> None:
+        if len(self._idle) < self.pool_size:
+            self._idle.append(context)
+
+
+def available_encodings() -> tuple[str, ...]:
+    encodings = []
+    if _zstd is not None:
+        encodings.append("zstd")
+    if _brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def negotiate_encoding(accept_encoding: str, supported: tuple[str, ...]) -> str | None:
+    """Pick the encoding with the highest client q-value, breaking ties by server preference."""
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    wildcard = weights.get("*", 0.0)
+    best: str | None = None
+    best_quality = 0.0
+    for encoding in _PREFERRED_ORDER:
+        if encoding not in supported:
+            continue
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """Negotiates zstd/br/gzip response compression.
+
+    Empty bodies, HEAD requests, 204/304 responses and bodies smaller than
+    ``minimum_size`` are sent as-is. Bodies larger than
+    ``chunk_size`` and streaming responses are compressed and sent in chunks
+    without a ``Content-Length``, so the first bytes leave before the whole
+    payload has been compressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        chunk_size: int = 64 * 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.chunk_size = chunk_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.supported = available_encodings()
+        self._zstd_codec = _ZstdCodec(zstd_level) if _zstd is not None else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""), self.supported)
+        # HEAD responses carry no body, so there is nothing to encode
+        if encoding is None or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def open_stream(self, encoding: str) -> CompressionStream:
+        if encoding == "zstd" and self._zstd_codec is not None:
+            return self._zstd_codec.open()
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.stream: CompressionStream | None = None
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers back until the first body chunk decides the encoding
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                message["status"] in _BODYLESS_STATUSES
+                or "content-encoding" in headers
+                or content_type.startswith(_EXCLUDED_TYPES)
+                or not content_type.startswith(_COMPRESSIBLE_TYPES)
+            )
+        elif message_type != "http.response.body" or self.passthrough:
+            await self._start()
+            await self._send(message)
+        elif not self.started:
+            await self._send_first_body(message)
+        else:
+            await self._send_chunk(message.get("body", b""), more_body=message.get("more_body", False))
+
+    async def _start(self) -> None:
+        if not self.started:
+            self.started = True
+            await self._send(self.initial_message)
+
+    async def _send_first_body(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not more_body and (not body or len(body) < self.middleware.minimum_size):
+            await self._start()
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Encoding"] = self.encoding
+        self.stream = self.middleware.open_stream(self.encoding)
+
+        if not more_body and len(body) <= self.middleware.chunk_size:
+            compressed = self.stream.compress(body) + self.stream.finish()
+            headers["Content-Length"] = str(len(compressed))
+            await self._start()
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+            return
+
+        del headers["Content-Length"]
+        await self._start()
+        await self._send_chunk(body, more_body=more_body)
+
+    async def _send_chunk(self, body: bytes, *, more_body: bool) -> None:
+        assert self.stream is not None
+        chunk_size = self.middleware.chunk_size
+        view = memoryview(body)
+        last = max(len(view) - 1, 0) // chunk_size * chunk_size
+        for offset in range(0, last, chunk_size):
+            compressed = self.stream.compress(view[offset : offset + chunk_size]) + self.stream.flush()
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": True})
+        compressed = self.stream.compress(view[last:])
+        compressed += self.stream.flush() if more_body else self.stream.finish()
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,6 +16,36 @@ class Settings(BaseSettings):
     jwt_algorithm: str = Field(default="HS256")
     access_token_expire_minutes: int = Field(default=15, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_minutes: int = Field(default=60 * 24 * 7, alias="REFRESH_TOKEN_EXPIRE_MINUTES")
+    password_hash_rounds: int | None = Field(default=None, alias="PASSWORD_HASH_ROUNDS")
+    password_hash_min_rounds: int = Field(default=310_000, ge=1, alias="PASSWORD_HASH_MIN_ROUNDS")
+    password_hash_target_ms: float = Field(default=250.0, gt=0, alias="PASSWORD_HASH_TARGET_MS")
+    password_hash_calibrate_on_startup: bool = Field(default=True, alias="PASSWORD_HASH_CALIBRATE_ON_STARTUP")
+    password_hash_calibration_file: str | None = Field(default=None, alias="PASSWORD_HASH_CALIBRATION_FILE")
+    audit_queue_max_size: int = Field(default=10_000, ge=1, alias="AUDIT_QUEUE_MAX_SIZE")
+    audit_flush_batch_size: int = Field(default=500, ge=1, alias="AUDIT_FLUSH_BATCH_SIZE")
+    audit_flush_interval_seconds: float = Field(default=1.0, gt=0, alias="AUDIT_FLUSH_INTERVAL_SECONDS")
+    audit_overflow_policy: Literal["block", "drop_oldest", "drop_newest"] = Field(
+        default="drop_oldest", alias="AUDIT_OVERFLOW_POLICY"
+    )
+    audit_shutdown_timeout_seconds: float = Field(default=10.0, gt=0, alias="AUDIT_SHUTDOWN_TIMEOUT_SECONDS")
+    audit_flush_max_attempts: int = Field(default=0, ge=0, alias="AUDIT_FLUSH_MAX_ATTEMPTS")
+    audit_flush_retry_backoff_seconds: float = Field(default=0.5, gt=0, alias="AUDIT_FLUSH_RETRY_BACKOFF_SECONDS")
+    audit_flush_max_retry_backoff_seconds: float = Field(
+        default=30.0, gt=0, alias="AUDIT_FLUSH_MAX_RETRY_BACKOFF_SECONDS"
+    )
+    metrics_token: str | None = Field(default=None, alias="METRICS_TOKEN")
+    shared_cache_dir: str | None = Field(default=None, alias="SHARED_CACHE_DIR")
+    shared_cache_refresh_seconds: float = Field(default=1.0, gt=0, alias="SHARED_CACHE_REFRESH_SECONDS")
+    shared_cache_revocation_rebuild_seconds: float = Field(
+        default=300.0, gt=0, alias="SHARED_CACHE_REVOCATION_REBUILD_SECONDS"
+    )
+    shared_cache_user_ttl_seconds: float = Field(default=5.0, gt=0, alias="SHARED_CACHE_USER_TTL_SECONDS")
+    shared_cache_user_slots: int = Field(default=65536, ge=1, alias="SHARED_CACHE_USER_SLOTS")
+    compression_minimum_size: int = Field(default=1024, ge=0, alias="COMPRESSION_MINIMUM_SIZE")
+    compression_chunk_size: int = Field(default=64 * 1024, ge=1024, alias="COMPRESSION_CHUNK_SIZE")
+    compression_gzip_level: int = Field(default=6, ge=1, le=9, alias="COMPRESSION_GZIP_LEVEL")
+    compression_brotli_quality: int = Field(default=4, ge=0, le=11, alias="COMPRESSION_BROTLI_QUALITY")
+    compression_zstd_level: int = Field(default=3, ge=1, le=22, alias="COMPRESSION_ZSTD_LEVEL")
 
 
 @lru_cache
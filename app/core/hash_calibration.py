@@ -0,0 +1,140 @@
+"""Measure PBKDF2 cost on the current host and pick rounds for a latency budget.
+
+Run ``python -m app.core.hash_calibration`` on a node to print the rounds it
+uses with the ``PASSWORD_HASH_*`` settings; pin the result with
+``PASSWORD_HASH_ROUNDS`` or let the API calibrate itself at startup. The result is cached in a file per node so that
+all workers, and this command, agree on the same cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from passlib.hash import pbkdf2_sha256
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_TARGET_MS = 250.0
+DEFAULT_MIN_ROUNDS = 310_000
+DEFAULT_CACHE_FILE = Path(tempfile.gettempdir()) / "brainwave3d-pbkdf2-rounds.json"
+_SAMPLE_ROUNDS = 50_000
+_ROUNDS_STEP = 1_000
+
+
+def measure_pbkdf2_ms(rounds: int = _SAMPLE_ROUNDS, *, samples: int = 5) -> float:
+    """Return the fastest of ``samples`` hash timings in milliseconds."""
+    handler = pbkdf2_sha256.using(rounds=rounds)
+    best = math.inf
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration-password")
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def calibrate_pbkdf2_rounds(
+    target_ms: float = DEFAULT_TARGET_MS,
+    *,
+    min_rounds: int = DEFAULT_MIN_ROUNDS,
+    max_rounds: int | None = None,
+    samples: int = 5,
+) -> int:
+    """Pick the rounds that make one hash take about ``target_ms`` here, never below ``min_rounds``."""
+    if max_rounds is not None and max_rounds < min_rounds:
+        raise ValueError(f"max_rounds ({max_rounds}) is below the min_rounds floor ({min_rounds})")
+    per_round_ms = measure_pbkdf2_ms(_SAMPLE_ROUNDS, samples=samples) / _SAMPLE_ROUNDS
+    rounds = math.ceil(target_ms / per_round_ms / _ROUNDS_STEP) * _ROUNDS_STEP
+    if max_rounds is not None:
+        rounds = min(rounds, max_rounds)
+    # The floor is applied last so no upper bound can weaken it
+    return max(rounds, min_rounds)
+
+
+@contextmanager
+def _exclusive(path: Path) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_suffix(".lock"), "a+b") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_or_calibrate(
+    cache_file: Path = DEFAULT_CACHE_FILE,
+    target_ms: float = DEFAULT_TARGET_MS,
+    *,
+    min_rounds: int = DEFAULT_MIN_ROUNDS,
+    max_rounds: int | None = None,
+    recalibrate: bool = False,
+) -> tuple[int, bool]:
+    """Return ``(rounds, cached)``, calibrating only if no result exists for these parameters.
+
+    The file lock makes sibling workers wait for the first one instead of all
+    measuring at once and competing for the same cores.
+    """
+    params = {"target_ms": target_ms, "min_rounds": min_rounds, "max_rounds": max_rounds}
+    with _exclusive(cache_file):
+        if not recalibrate:
+            try:
+                cached = json.loads(cache_file.read_text())
+            except (FileNotFoundError, ValueError):
+                cached = None
+            if isinstance(cached, dict) and cached.get("params") == params:
+                return int(cached["rounds"]), True
+        rounds = calibrate_pbkdf2_rounds(target_ms, min_rounds=min_rounds, max_rounds=max_rounds)
+        tmp_file = cache_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps({"rounds": rounds, "params": params}))
+        os.replace(tmp_file, cache_file)
+    return rounds, False
+
+
+def main() -> None:
+    # Default to the API's settings so the command reads and writes the same cache entry
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--target-ms", type=float, default=settings.password_hash_target_ms, help="Latency budget per hash"
+    )
+    parser.add_argument("--min-rounds", type=int, default=settings.password_hash_min_rounds, help="Security floor")
+    parser.add_argument("--max-rounds", type=int, default=None, help="Optional upper bound")
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=Path(settings.password_hash_calibration_file or DEFAULT_CACHE_FILE),
+        help="Per-node calibration result",
+    )
+    parser.add_argument("--recalibrate", action="store_true", help="Measure again even if a result is cached")
+    args = parser.parse_args()
+    if args.max_rounds is not None and args.max_rounds < args.min_rounds:
+        parser.error(f"--max-rounds ({args.max_rounds}) must not be below --min-rounds ({args.min_rounds})")
+
+    rounds, cached = load_or_calibrate(
+        args.cache_file,
+        args.target_ms,
+        min_rounds=args.min_rounds,
+        max_rounds=args.max_rounds,
+        recalibrate=args.recalibrate,
+    )
+    hash_ms = measure_pbkdf2_ms(rounds, samples=1)
+    print(f"PASSWORD_HASH_ROUNDS={rounds}{'  # cached in ' + str(args.cache_file) if cached else ''}")
+    print(f"# {hash_ms:.0f} ms per hash, about {1000 / hash_ms:.1f} logins/s per core")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import secrets
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any, Dict, Optional
 from uuid import uuid4
 
@@ -12,6 +14,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.hash_calibration import DEFAULT_CACHE_FILE, load_or_calibrate
+from app.core.shared_cache import shared_cache
 from app.db.models import TOKEN_BLACKLIST_COLLECTION
 from app.db.session import get_database
 from app.services.user_service import UserService
@@ -25,8 +29,11 @@ except ImportError:  # pragma: no cover - optional legacy dependency
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256"],
     deprecated="auto",
-    pbkdf2_sha256__default_rounds=310000,
+    pbkdf2_sha256__default_rounds=settings.password_hash_rounds or settings.password_hash_min_rounds,
 )
+# Hashes within this fraction below the current cost are kept, so small
+# calibration differences between nodes do not trigger constant rehashing
+_REHASH_TOLERANCE = 0.1
 _http_bearer = HTTPBearer(auto_error=False)
 user_service = UserService()
 
@@ -42,6 +49,39 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def configure_password_hashing() -> tuple[int, str]:
+    """Apply the pinned or node-calibrated PBKDF2 cost to ``pwd_context``.
+
+    Returns the rounds and where they came from (``pinned``, ``calibrated``,
+    ``cached`` or ``floor``) so startup can log them.
+    """
+    rounds = settings.password_hash_rounds
+    source = "pinned"
+    if rounds is None and settings.password_hash_calibrate_on_startup:
+        cache_file = Path(settings.password_hash_calibration_file or DEFAULT_CACHE_FILE)
+        rounds, cached = load_or_calibrate(
+            cache_file,
+            settings.password_hash_target_ms,
+            min_rounds=settings.password_hash_min_rounds,
+        )
+        source = "cached" if cached else "calibrated"
+    elif rounds is None:
+        source = "floor"
+    rounds = max(rounds or settings.password_hash_min_rounds, settings.password_hash_min_rounds)
+    pwd_context.update(
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=max(int(rounds * (1 - _REHASH_TOLERANCE)), settings.password_hash_min_rounds),
+    )
+    return rounds, source
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    if pwd_context.identify(password_hash) is None:
+        # Legacy bcrypt (or unknown) hashes are always migrated to the current scheme
+        return True
+    return pwd_context.needs_update(password_hash)
+
+
 def verify_password(password: str, password_hash: str) -> bool:
     # Prefer the configured context, but fall back to bcrypt hashes that may exist already
     identified = pwd_context.identify(password_hash)
@@ -94,8 +134,10 @@ def decode_token(token: str) -> Dict[str, Any]:
 
 
 async def _ensure_token_not_blacklisted(db: AsyncIOMotorDatabase, jti: str) -> None:
-    token_entry = await db[TOKEN_BLACKLIST_COLLECTION].find_one({"jti": jti})
-    if token_entry is not None:
+    revoked = shared_cache.is_revoked(jti)
+    if revoked is None:
+        revoked = await db[TOKEN_BLACKLIST_COLLECTION].find_one({"jti": jti}) is not None
+    if revoked:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
 
 
@@ -117,3 +159,15 @@ async def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User no longer exists")
 
     return user
+
+
+async def require_metrics_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_http_bearer),
+) -> None:
+    # Without METRICS_TOKEN the operational endpoints are not served at all
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.metrics_token.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
@@ -0,0 +1,501 @@
+"""Optional cross-worker cache backed by mmap'd files.
+
+Workers on the same host share one directory (ideally on tmpfs such as
+``/dev/shm``). Read-mostly data is published there as versioned snapshots and
+every worker maps the same pages, so the memory used grows with the data rather
+than with the number of workers:
+
+- the refresh-token revocation set, brought up to date from Mongo every
+  ``refresh_seconds`` by whichever worker takes the lock first, with this
+  host's own revocations merged in immediately. A set older than
+  ``3 * refresh_seconds`` is not trusted, so revocations made on other hosts
+  are seen within about three refresh intervals;
+- user snapshots by id. Each is tagged with a per-user generation counter that
+  ``invalidate_user`` bumps, so changes made on this host take effect at once.
+  Every snapshot also expires after ``user_ttl_seconds``, which bounds how
+  long changes made on other hosts can go unseen; expired files are swept;
+- ML artifacts keyed by name and version, built once per host and attached
+  read-only by every worker.
+
+``multiprocessing.shared_memory`` is not used because its resource tracker
+unlinks segments when the worker that created them exits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.db.models import TOKEN_BLACKLIST_COLLECTION, now_utc
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"BW3DSNAP"
+_HEADER = struct.Struct("<8sQd")  # magic, version, published_at
+_GENERATION = struct.Struct("<Q")
+_USER_HEADER = struct.Struct("<Qd")  # generation, published_at
+_ARTIFACT_KEY = re.compile(r"^[A-Za-z0-9._-]+$")
+_DIGEST_SIZE = 16
+_REVOCATIONS = "revocations"
+# How many refresh intervals a revocation set stays trusted before checks go back to Mongo
+_REVOCATIONS_MAX_AGE_INTERVALS = 3
+# Incremental refreshes re-read entries this much older than the last scan, to
+# cover clock skew between pods and inserts that became visible late
+_REVOCATIONS_SCAN_OVERLAP_SECONDS = 30.0
+
+
+@dataclass
+class _Snapshot:
+    inode: int
+    version: int
+    published_at: float
+    mapping: mmap.mmap | None
+    data: memoryview
+
+
+@contextmanager
+def _locked(path: Path, *, blocking: bool = True) -> Iterator[bool]:
+    with open(path, "a+b") as lock_file:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock_file, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_atomic(path: Path, *chunks: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            for chunk in chunks:
+                tmp_file.write(chunk)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def _jti_digest(jti: str) -> bytes:
+    return hashlib.blake2b(jti.encode("utf-8"), digest_size=_DIGEST_SIZE).digest()
+
+
+def _split_digests(data: memoryview) -> set[bytes]:
+    raw = data.tobytes()
+    return {raw[offset : offset + _DIGEST_SIZE] for offset in range(0, len(raw), _DIGEST_SIZE)}
+
+
+class SnapshotStore:
+    """Publishes named byte payloads atomically and maps them read-only."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def publish(self, name: str, payload: bytes) -> int:
+        with _locked(self.directory / f"{name}.publish.lock"):
+            return self._publish_locked(name, payload, time.time())
+
+    def update(
+        self,
+        name: str,
+        change: Callable[[_Snapshot | None], bytes | None],
+        *,
+        published_at: float | None = None,
+    ) -> bool:
+        """Replace the payload of ``name`` based on its current contents.
+
+        ``change`` gets the current snapshot (or ``None``) under the publish lock
+        and returns the new payload, or ``None`` to leave it alone. The snapshot
+        keeps its ``published_at`` unless a new one is given.
+        """
+        with _locked(self.directory / f"{name}.publish.lock"):
+            snapshot = self.attach(name)
+            payload = change(snapshot)
+            if payload is None:
+                return False
+            if published_at is None:
+                published_at = snapshot.published_at if snapshot is not None else time.time()
+            self._publish_locked(name, payload, published_at)
+        return True
+
+    def _publish_locked(self, name: str, payload: bytes, published_at: float) -> int:
+        path = self.directory / f"{name}.snap"
+        current = self._read_header(path)
+        version = current[0] + 1 if current else 1
+        _write_atomic(path, _HEADER.pack(_MAGIC, version, published_at), payload)
+        return version
+
+    def attach(self, name: str, previous: _Snapshot | None = None) -> _Snapshot | None:
+        """Map the latest snapshot of ``name``; returns ``previous`` when it is still current."""
+        path = self.directory / f"{name}.snap"
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if previous is not None and previous.inode == stat.st_ino:
+            return previous
+        with open(path, "rb") as snapshot_file:
+            if stat.st_size == _HEADER.size:
+                header = snapshot_file.read(_HEADER.size)
+                mapping, data = None, memoryview(b"")
+            else:
+                mapping = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+                header = mapping[: _HEADER.size]
+                data = memoryview(mapping)[_HEADER.size :]
+        magic, version, published_at = _HEADER.unpack(header)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        return _Snapshot(inode=stat.st_ino, version=version, published_at=published_at, mapping=mapping, data=data)
+
+    @staticmethod
+    def _read_header(path: Path) -> tuple[int, float] | None:
+        try:
+            with open(path, "rb") as snapshot_file:
+                magic, version, published_at = _HEADER.unpack(snapshot_file.read(_HEADER.size))
+        except (FileNotFoundError, struct.error):
+            return None
+        return (version, published_at) if magic == _MAGIC else None
+
+
+class GenerationTable:
+    """Fixed table of per-key counters in a shared mmap; keys hash into slots."""
+
+    def __init__(self, path: Path, slots: int) -> None:
+        self.path = path
+        self.slots = slots
+        size = slots * _GENERATION.size
+        with _locked(path.with_suffix(".lock")):
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+                self._mapping = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+
+    def get(self, key: str) -> int:
+        return _GENERATION.unpack_from(self._mapping, self._offset(key))[0]
+
+    def bump(self, key: str) -> int:
+        offset = self._offset(key)
+        with _locked(self.path.with_suffix(".lock")):
+            generation = _GENERATION.unpack_from(self._mapping, offset)[0] + 1
+            _GENERATION.pack_into(self._mapping, offset, generation)
+        return generation
+
+    def close(self) -> None:
+        self._mapping.close()
+
+    def _offset(self, key: str) -> int:
+        return (zlib.crc32(key.encode("utf-8")) % self.slots) * _GENERATION.size
+
+
+class SharedCache:
+    """Process-wide entry point; every method is a no-op until ``open`` is called."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.refresh_seconds = 1.0
+        self.user_ttl_seconds = 5.0
+        self.revocation_rebuild_seconds = 300.0
+        self._directory: Path | None = None
+        self._store: SnapshotStore | None = None
+        self._generations: GenerationTable | None = None
+        self._revocations: _Snapshot | None = None
+        self._revocations_checked_at = 0.0
+        self._artifacts: dict[str, _Snapshot] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def open(
+        self,
+        directory: str,
+        *,
+        refresh_seconds: float = 1.0,
+        user_ttl_seconds: float = 5.0,
+        user_slots: int = 65536,
+        revocation_rebuild_seconds: float = 300.0,
+    ) -> None:
+        if self.enabled:
+            return
+        if fcntl is None:
+            raise RuntimeError("The shared cache needs fcntl file locks, which this platform does not provide")
+        path = Path(directory)
+        (path / "users").mkdir(parents=True, exist_ok=True)
+        self._directory = path
+        self._store = SnapshotStore(path)
+        self._generations = GenerationTable(path / "user_generations.bin", user_slots)
+        self.refresh_seconds = refresh_seconds
+        self.user_ttl_seconds = user_ttl_seconds
+        self.revocation_rebuild_seconds = revocation_rebuild_seconds
+        self.enabled = True
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._refresh_loop(db), name="shared-cache-refresh")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._generations is not None:
+            self._generations.close()
+        self.enabled = False
+        self._store = None
+        self._generations = None
+        self._revocations = None
+        self._artifacts.clear()
+
+    # Revocations
+
+    def is_revoked(self, jti: str) -> bool | None:
+        """Answer from the shared revocation set, or ``None`` when it is missing or stale.
+
+        ``published_at`` is when the Mongo scan behind the set started, so a
+        revocation made on another host is missed for at most
+        ``3 * refresh_seconds`` plus the ``refresh_seconds / 4`` between attach
+        checks.
+        """
+        if not self.enabled:
+            return None
+        snapshot = self._current_revocations()
+        max_age = _REVOCATIONS_MAX_AGE_INTERVALS * self.refresh_seconds
+        if snapshot is None or time.time() - snapshot.published_at > max_age:
+            return None
+        digest = _jti_digest(jti)
+        data = snapshot.data
+        low, high = 0, len(data) // _DIGEST_SIZE
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * _DIGEST_SIZE
+            candidate = data[offset : offset + _DIGEST_SIZE].tobytes()
+            if candidate == digest:
+                return True
+            if candidate < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    async def refresh_revocations(self, db: AsyncIOMotorDatabase, *, force: bool = False) -> None:
+        """Bring the shared revocation set up to date with Mongo.
+
+        Normally only blacklist entries created since the last scan are read and
+        merged into the set. Every ``revocation_rebuild_seconds`` the set is
+        rebuilt from all unexpired entries instead, which drops expired JTIs.
+        Either way the result is merged under the publish lock with whatever
+        ``add_revocation`` added during the scan, so no local logout is lost.
+        """
+        if not self.enabled:
+            return
+        assert self._directory is not None and self._store is not None
+        with _locked(self._directory / f"{_REVOCATIONS}.refresh.lock", blocking=False) as acquired:
+            if not acquired:
+                return
+            base = self._current_revocations(force=True)
+            started = time.time()
+            if not force and base is not None and started - base.published_at < self.refresh_seconds / 2:
+                return
+            rebuild = base is None or self._revocation_rebuild_due(started)
+            query: dict[str, Any] = {"expires_at": {"$gt": now_utc()}}
+            if base is not None and not rebuild:
+                since = base.published_at - _REVOCATIONS_SCAN_OVERLAP_SECONDS
+                query["created_at"] = {"$gte": datetime.fromtimestamp(since, tz=timezone.utc)}
+            cursor = db[TOKEN_BLACKLIST_COLLECTION].find(query, {"jti": 1, "_id": 0})
+            jtis = [entry["jti"] async for entry in cursor]
+
+            def merge(current: _Snapshot | None) -> bytes:
+                digests = {_jti_digest(jti) for jti in jtis}
+                if current is not None:
+                    kept = _split_digests(current.data)
+                    if rebuild and base is not None:
+                        # Only keep what add_revocation merged in after the scan began
+                        kept -= _split_digests(base.data)
+                    digests |= kept
+                return b"".join(sorted(digests))
+
+            # Hashing and sorting a large set would stall the event loop
+            await asyncio.to_thread(self._store.update, _REVOCATIONS, merge, published_at=started)
+            if rebuild:
+                (self._directory / f"{_REVOCATIONS}.rebuilt").touch()
+        self._current_revocations(force=True)
+
+    def add_revocation(self, jti: str) -> None:
+        """Merge one revoked JTI into the published set without rescanning Mongo.
+
+        The set keeps its original ``published_at``: it is still only as complete
+        as the last full refresh for revocations made on other hosts.
+        """
+        if not self.enabled:
+            return
+        assert self._store is not None
+        digest = _jti_digest(jti)
+
+        def insert(snapshot: _Snapshot | None) -> bytes | None:
+            # Without a published set there is nothing to merge into; checks use Mongo
+            if snapshot is None:
+                return None
+            data = snapshot.data
+            low, high = 0, len(data) // _DIGEST_SIZE
+            while low < high:
+                middle = (low + high) // 2
+                candidate = data[middle * _DIGEST_SIZE : (middle + 1) * _DIGEST_SIZE].tobytes()
+                if candidate == digest:
+                    return None
+                if candidate < digest:
+                    low = middle + 1
+                else:
+                    high = middle
+            offset = low * _DIGEST_SIZE
+            return b"".join((data[:offset], digest, data[offset:]))
+
+        self._store.update(_REVOCATIONS, insert)
+        self._current_revocations(force=True)
+
+    def _revocation_rebuild_due(self, now: float) -> bool:
+        assert self._directory is not None
+        try:
+            rebuilt_at = (self._directory / f"{_REVOCATIONS}.rebuilt").stat().st_mtime
+        except FileNotFoundError:
+            return True
+        return now - rebuilt_at >= self.revocation_rebuild_seconds
+
+    def _current_revocations(self, *, force: bool = False) -> _Snapshot | None:
+        now = time.monotonic()
+        if force or now - self._revocations_checked_at >= self.refresh_seconds / 4:
+            assert self._store is not None
+            self._revocations = self._store.attach(_REVOCATIONS, self._revocations)
+            self._revocations_checked_at = now
+        return self._revocations
+
+    async def _refresh_loop(self, db: AsyncIOMotorDatabase) -> None:
+        while True:
+            try:
+                await self.refresh_revocations(db)
+            except Exception:
+                logger.exception("Failed to refresh shared revocation set")
+            try:
+                self.sweep_users()
+            except Exception:
+                logger.exception("Failed to sweep shared user snapshots")
+            await asyncio.sleep(self.refresh_seconds)
+
+    # Users
+
+    def user_generation(self, user_id: str) -> int | None:
+        if not self.enabled:
+            return None
+        assert self._generations is not None
+        return self._generations.get(user_id)
+
+    def get_user(self, user_id: str) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        assert self._directory is not None and self._generations is not None
+        try:
+            raw = (self._directory / "users" / f"{user_id}.bson").read_bytes()
+        except FileNotFoundError:
+            return None
+        generation, published_at = _USER_HEADER.unpack_from(raw)
+        if generation != self._generations.get(user_id) or time.time() - published_at > self.user_ttl_seconds:
+            return None
+        return bson.decode(raw[_USER_HEADER.size :])
+
+    def store_user(self, user_id: str, user: dict[str, Any], generation: int) -> None:
+        """Store a snapshot read while ``generation`` was current; readers drop it once that changes."""
+        if not self.enabled:
+            return
+        assert self._directory is not None
+        header = _USER_HEADER.pack(generation, time.time())
+        _write_atomic(self._directory / "users" / f"{user_id}.bson", header, bson.encode(user))
+
+    def sweep_users(self) -> int:
+        """Delete user snapshots past their TTL so only recently read users stay on disk."""
+        if not self.enabled:
+            return 0
+        assert self._directory is not None
+        removed = 0
+        cutoff = time.time() - self.user_ttl_seconds
+        with _locked(self._directory / "users.sweep.lock", blocking=False) as acquired:
+            if not acquired:
+                return 0
+            with os.scandir(self._directory / "users") as entries:
+                for entry in entries:
+                    try:
+                        if entry.stat().st_mtime < cutoff:
+                            os.unlink(entry.path)
+                            removed += 1
+                    except FileNotFoundError:
+                        continue
+        return removed
+
+    def invalidate_user(self, user_id: str) -> None:
+        if not self.enabled:
+            return
+        assert self._directory is not None and self._generations is not None
+        self._generations.bump(user_id)
+        try:
+            (self._directory / "users" / f"{user_id}.bson").unlink()
+        except FileNotFoundError:
+            pass
+
+    # Artifacts
+
+    def artifact(self, name: str, version: str, build: Callable[[], bytes]) -> memoryview:
+        """Return a read-only view of ``name`` at ``version``, building and publishing it if no worker has yet.
+
+        Older versions of the same artifact are removed when a new one is
+        published; workers that still map them keep a valid view.
+        """
+        if not self.enabled:
+            return memoryview(build())
+        if not (_ARTIFACT_KEY.match(name) and _ARTIFACT_KEY.match(version)):
+            raise ValueError(f"Invalid artifact name or version: {name!r} {version!r}")
+        key = f"artifact-{name}@{version}"
+        cached = self._artifacts.get(key)
+        if cached is not None:
+            return cached.data
+        assert self._directory is not None and self._store is not None
+        with _locked(self._directory / f"artifact-{name}.build.lock"):
+            snapshot = self._store.attach(key)
+            if snapshot is None:
+                self._store.publish(key, build())
+                snapshot = self._store.attach(key)
+                for stale in self._directory.glob(f"artifact-{name}@*"):
+                    if not stale.name.startswith(f"{key}."):
+                        stale.unlink(missing_ok=True)
+        assert snapshot is not None
+        self._artifacts[key] = snapshot
+        return snapshot.data
+
+
+shared_cache = SharedCache()
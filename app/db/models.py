@@ -7,6 +7,7 @@ from bson import ObjectId
 
 USERS_COLLECTION = "users"
 TOKEN_BLACKLIST_COLLECTION = "token_blacklist"
+AUDIT_LOG_COLLECTION = "audit_log"
 
 _PERSONAL_INFO_KEYS = ("full_name", "date_of_birth", "gender")
 _CLINICAL_INFO_KEYS = (
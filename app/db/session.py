@@ -6,7 +6,7 @@ from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from app.core.config import settings
-from app.db.models import TOKEN_BLACKLIST_COLLECTION, USERS_COLLECTION
+from app.db.models import AUDIT_LOG_COLLECTION, TOKEN_BLACKLIST_COLLECTION, USERS_COLLECTION
 
 _client: Optional[AsyncIOMotorClient] = None
 
@@ -28,6 +28,10 @@ async def connect_to_db() -> None:
     )
     await db[TOKEN_BLACKLIST_COLLECTION].create_index("jti", unique=True)
     await db[TOKEN_BLACKLIST_COLLECTION].create_index("expires_at", expireAfterSeconds=0)
+    # Incremental refreshes of the shared revocation set read recent entries only
+    await db[TOKEN_BLACKLIST_COLLECTION].create_index("created_at")
+    await db[AUDIT_LOG_COLLECTION].create_index([("user_id", 1), ("created_at", -1)])
+    await db[AUDIT_LOG_COLLECTION].create_index([("event", 1), ("created_at", -1)])
 
     _client = client
 
@@ -39,6 +43,12 @@ async def close_db() -> None:
         _client = None
 
 
+def current_database() -> AsyncIOMotorDatabase:
+    if _client is None:
+        raise RuntimeError("MongoDB client is not initialized")
+    return _client[settings.mongo_db_name]
+
+
 async def get_database() -> AsyncIterator[AsyncIOMotorDatabase]:
     if _client is None:
         await connect_to_db()
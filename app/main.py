@@ -1,28 +1,61 @@
 from __future__ import annotations
 
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import auth as auth_routes
+from app.api import metrics as metrics_routes
 from app.api import profile as profile_routes
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.db.session import close_db, connect_to_db
+from app.core.security import configure_password_hashing
+from app.core.shared_cache import shared_cache
+from app.db.session import close_db, connect_to_db, current_database
+from app.services.audit_service import audit_writer
+from app.services.auth_service import drain_rehash_tasks
+
+# uvicorn configures this logger, so startup messages show up without extra logging setup
+logger = logging.getLogger("uvicorn.error")
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    rounds, source = configure_password_hashing()
+    logger.info("Password hashing: pbkdf2_sha256 with %d rounds (%s)", rounds, source)
     await connect_to_db()
+    await audit_writer.start(current_database())
+    if settings.shared_cache_dir:
+        shared_cache.open(
+            settings.shared_cache_dir,
+            refresh_seconds=settings.shared_cache_refresh_seconds,
+            user_ttl_seconds=settings.shared_cache_user_ttl_seconds,
+            user_slots=settings.shared_cache_user_slots,
+            revocation_rebuild_seconds=settings.shared_cache_revocation_rebuild_seconds,
+        )
+        await shared_cache.start(current_database())
     try:
         yield
     finally:
+        await drain_rehash_tasks()
+        await shared_cache.close()
+        await audit_writer.stop()
         await close_db()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(title=settings.project_name, lifespan=lifespan)
 
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        chunk_size=settings.compression_chunk_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        zstd_level=settings.compression_zstd_level,
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -33,6 +66,7 @@ def create_app() -> FastAPI:
 
     app.include_router(auth_routes.router)
     app.include_router(profile_routes.router)
+    app.include_router(metrics_routes.router)
 
     return app
 
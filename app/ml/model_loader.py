@@ -1,6 +1,19 @@
-from typing import Any
+from typing import Any, Callable
+
+from app.core.shared_cache import shared_cache
 
 
 async def load_model() -> Any:
     """Placeholder for loading ML assets."""
     return None
+
+
+def load_weights(name: str, version: str, build: Callable[[], bytes]) -> memoryview:
+    """Return model weights as a read-only buffer shared by all workers on the host.
+
+    ``build`` runs once per host and ``version`` when the shared cache is enabled
+    (once per worker otherwise), so bump ``version`` (e.g. a checkpoint hash)
+    whenever the weights change. Wrap the result with e.g. ``numpy.frombuffer``
+    to get an array without copying.
+    """
+    return shared_cache.artifact(name, version, build)
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class AuditMetricsResponse(BaseModel):
+    queue_depth: int
+    events_enqueued: int
+    events_dropped: int
+    events_written: int
+    events_failed: int
+    flushes: int
+    flush_retries: int
+    last_flush_latency_ms: float
+    max_flush_latency_ms: float
+    avg_flush_latency_ms: float
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.db.models import AUDIT_LOG_COLLECTION, now_utc
+
+logger = logging.getLogger(__name__)
+
+_DUPLICATE_KEY_ERROR = 11000
+
+AUDIT_LOGIN_SUCCEEDED = "auth.login.succeeded"
+AUDIT_LOGIN_FAILED = "auth.login.failed"
+AUDIT_PROFILE_READ = "profile.read"
+AUDIT_PROFILE_UPDATED = "profile.updated"
+AUDIT_PROFILE_DELETED = "profile.deleted"
+
+
+@dataclass
+class AuditMetrics:
+    events_enqueued: int = 0
+    events_dropped: int = 0
+    events_written: int = 0
+    events_failed: int = 0
+    flushes: int = 0
+    flush_retries: int = 0
+    last_flush_latency_ms: float = 0.0
+    max_flush_latency_ms: float = 0.0
+    total_flush_latency_ms: float = 0.0
+
+
+class AuditLogWriter:
+    """Buffers audit events in memory and writes them to Mongo in batches.
+
+    Events are queued without touching the database on the request path; a
+    background task flushes them with ``insert_many`` once ``batch_size`` events
+    are pending or ``flush_interval`` seconds have passed. When the queue is full
+    the ``overflow_policy`` decides whether callers wait (``block``), the oldest
+    pending event is discarded (``drop_oldest``) or the new event is discarded
+    (``drop_newest``). Dropped events are counted in the metrics.
+
+    A failed ``insert_many`` is retried with exponential backoff while new
+    events keep queueing behind it under the same overflow policy. With
+    ``max_flush_attempts=0`` (the default) a batch is retried until it is
+    written or shutdown times out; a positive value discards the batch after
+    that many attempts and counts it in ``events_failed``. Retries are safe
+    because each event keeps its ``_id``, so already-written events only
+    produce duplicate key errors, which are ignored.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = settings.audit_queue_max_size,
+        batch_size: int = settings.audit_flush_batch_size,
+        flush_interval: float = settings.audit_flush_interval_seconds,
+        overflow_policy: str = settings.audit_overflow_policy,
+        shutdown_timeout: float = settings.audit_shutdown_timeout_seconds,
+        max_flush_attempts: int = settings.audit_flush_max_attempts,
+        retry_backoff: float = settings.audit_flush_retry_backoff_seconds,
+        max_retry_backoff: float = settings.audit_flush_max_retry_backoff_seconds,
+    ) -> None:
+        if overflow_policy not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown audit overflow policy: {overflow_policy}")
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.shutdown_timeout = shutdown_timeout
+        self.max_flush_attempts = max_flush_attempts
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self._inflight = 0
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._db: AsyncIOMotorDatabase | None = None
+        self._closing = False
+        self._metrics = AuditMetrics()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        if self.running:
+            return
+        self._db = db
+        self._closing = False
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            pending = (self._queue.qsize() if self._queue is not None else 0) + self._inflight
+            logger.error("Audit log writer did not drain within %.1fs; %d events lost", self.shutdown_timeout, pending)
+            self._metrics.events_dropped += pending
+        self._task = None
+        self._queue = None
+
+    async def record(self, event: str, *, user_id: str | None = None, **details: Any) -> None:
+        entry: dict[str, Any] = {"event": event, "user_id": user_id, "created_at": now_utc()}
+        if details:
+            entry["details"] = details
+
+        queue = self._queue
+        if queue is None or self._closing:
+            self._metrics.events_dropped += 1
+            logger.warning("Audit log writer is not running; dropped %s event", event)
+            return
+
+        if self.overflow_policy == "block":
+            await queue.put(entry)
+        else:
+            try:
+                queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                self._metrics.events_dropped += 1
+                if self.overflow_policy == "drop_newest":
+                    logger.warning("Audit queue full; dropped %s event", event)
+                    return
+                dropped = queue.get_nowait()
+                queue.put_nowait(entry)
+                logger.warning("Audit queue full; dropped oldest %s event", dropped["event"])
+        self._metrics.events_enqueued += 1
+
+    def metrics(self) -> dict[str, Any]:
+        snapshot = asdict(self._metrics)
+        snapshot["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        flushes = self._metrics.flushes
+        snapshot["avg_flush_latency_ms"] = self._metrics.total_flush_latency_ms / flushes if flushes else 0.0
+        return snapshot
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+            elif self._closing:
+                return
+
+    async def _next_batch(self) -> list[dict[str, Any]]:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch: list[dict[str, Any]] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            if self._closing:
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: list[dict[str, Any]]) -> None:
+        self._inflight = len(batch)
+        started = time.perf_counter()
+        attempt = 0
+        backoff = self.retry_backoff
+        try:
+            while True:
+                attempt += 1
+                try:
+                    await self._insert(batch)
+                except Exception:
+                    if self.max_flush_attempts and attempt >= self.max_flush_attempts:
+                        self._metrics.events_failed += len(batch)
+                        logger.exception("Discarding %d audit events after %d attempts", len(batch), attempt)
+                        break
+                    self._metrics.flush_retries += 1
+                    logger.warning(
+                        "Failed to write %d audit events (attempt %d); retrying in %.1fs",
+                        len(batch),
+                        attempt,
+                        backoff,
+                        exc_info=True,
+                    )
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_retry_backoff)
+                else:
+                    self._metrics.events_written += len(batch)
+                    break
+        finally:
+            self._inflight = 0
+        latency_ms = (time.perf_counter() - started) * 1000
+        self._metrics.flushes += 1
+        self._metrics.last_flush_latency_ms = latency_ms
+        self._metrics.total_flush_latency_ms += latency_ms
+        self._metrics.max_flush_latency_ms = max(self._metrics.max_flush_latency_ms, latency_ms)
+
+    async def _insert(self, batch: list[dict[str, Any]]) -> None:
+        assert self._db is not None
+        try:
+            await self._db[AUDIT_LOG_COLLECTION].insert_many(batch, ordered=False)
+        except BulkWriteError as exc:
+            errors = exc.details.get("writeErrors", [])
+            if exc.details.get("writeConcernErrors") or any(
+                error.get("code") != _DUPLICATE_KEY_ERROR for error in errors
+            ):
+                raise
+
+
+audit_writer = AuditLogWriter()
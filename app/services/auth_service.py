@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from datetime import datetime, timezone
 from typing import Any
 
@@ -12,12 +14,21 @@ from app.core.security import (
     create_refresh_token,
     decode_token,
     get_password_hash,
+    password_needs_rehash,
     verify_password,
 )
+from app.core.shared_cache import shared_cache
 from app.db.models import TOKEN_BLACKLIST_COLLECTION, now_utc
 from app.schemas.auth import LoginRequest, SignupRequest
+from app.services.audit_service import AUDIT_LOGIN_FAILED, AUDIT_LOGIN_SUCCEEDED, audit_writer
 from app.services.user_service import UserService
 
+logger = logging.getLogger(__name__)
+
+_REHASH_DRAIN_TIMEOUT_SECONDS = 5.0
+# Rehashes outlive the login request that scheduled them; shutdown drains them before closing Mongo
+_rehash_tasks: set[asyncio.Task[None]] = set()
+
 
 class AuthService:
     def __init__(self) -> None:
@@ -42,7 +53,7 @@ class AuthService:
         full_name = normalized_full_name
         if not full_name:
             raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Full name cannot be blank")
-        password_hash = get_password_hash(password)
+        password_hash = await asyncio.to_thread(get_password_hash, password)
         user_data: dict[str, Any] = {
             "email": signup_payload["email"],
             "personal_info": {"full_name": full_name},
@@ -54,9 +65,18 @@ class AuthService:
         self, db: AsyncIOMotorDatabase, login: LoginRequest
     ) -> tuple[dict[str, Any], TokenMeta, TokenMeta]:
         user = await self.user_service.get_by_email(db, login.email, include_password=True)
-        if user is None or not verify_password(login.password, user.get("password_hash", "")):
+        # Hashing takes PASSWORD_HASH_TARGET_MS of CPU; keep it off the event loop
+        if user is None or not await asyncio.to_thread(verify_password, login.password, user.get("password_hash", "")):
+            await audit_writer.record(
+                AUDIT_LOGIN_FAILED,
+                user_id=user["id"] if user is not None else None,
+                email=login.email,
+            )
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
+        if password_needs_rehash(user["password_hash"]):
+            self._schedule_rehash(db, user["id"], login.password, user["password_hash"])
         sanitized_user = self.user_service.sanitize_user(user)
+        await audit_writer.record(AUDIT_LOGIN_SUCCEEDED, user_id=sanitized_user["id"])
         return sanitized_user, *self._issue_tokens(sanitized_user)
 
     async def blacklist_refresh_token(self, db: AsyncIOMotorDatabase, token: str) -> None:
@@ -78,6 +98,19 @@ class AuthService:
             "created_at": now_utc(),
         }
         await db[TOKEN_BLACKLIST_COLLECTION].insert_one(entry)
+        shared_cache.add_revocation(jti)
+
+    def _schedule_rehash(self, db: AsyncIOMotorDatabase, user_id: str, password: str, current_hash: str) -> None:
+        task = asyncio.create_task(self._rehash_password(db, user_id, password, current_hash))
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+
+    async def _rehash_password(self, db: AsyncIOMotorDatabase, user_id: str, password: str, current_hash: str) -> None:
+        try:
+            new_hash = await asyncio.to_thread(get_password_hash, password)
+            await self.user_service.update_password_hash(db, user_id, current_hash, new_hash)
+        except Exception:
+            logger.exception("Failed to upgrade password hash for user %s", user_id)
 
     def _issue_tokens(self, user: dict[str, Any]) -> tuple[TokenMeta, TokenMeta]:
         personal_info = user.get("personal_info") or {}
@@ -88,3 +121,15 @@ class AuthService:
         access_meta = create_access_token(subject=str(user.get("id")), extra_claims=extra_claims)
         refresh_meta = create_refresh_token(subject=str(user.get("id")), extra_claims=extra_claims)
         return access_meta, refresh_meta
+
+
+async def drain_rehash_tasks(timeout: float = _REHASH_DRAIN_TIMEOUT_SECONDS) -> None:
+    """Wait for pending password rehashes, cancelling any still running after ``timeout``."""
+    if not _rehash_tasks:
+        return
+    _, pending = await asyncio.wait(set(_rehash_tasks), timeout=timeout)
+    if pending:
+        logger.warning("Cancelling %d password rehashes still running at shutdown", len(pending))
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
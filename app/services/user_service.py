@@ -7,6 +7,7 @@ from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ReturnDocument
 
+from app.core.shared_cache import shared_cache
 from app.db.models import USERS_COLLECTION, now_utc, serialize_user
 from app.schemas.user import UserUpdate
 
@@ -30,10 +31,20 @@ class UserService:
     ) -> dict[str, Any] | None:
         if not ObjectId.is_valid(user_id):
             return None
+        generation = None
+        if not include_password and shared_cache.enabled:
+            cached = shared_cache.get_user(user_id)
+            if cached is not None:
+                return cached
+            # Read the generation before Mongo so a concurrent update invalidates what we store
+            generation = shared_cache.user_generation(user_id)
         document = await db[USERS_COLLECTION].find_one({"_id": ObjectId(user_id)})
         if document is None:
             return None
-        return serialize_user(document, include_password=include_password)
+        user = serialize_user(document, include_password=include_password)
+        if generation is not None:
+            shared_cache.store_user(user_id, user, generation)
+        return user
 
     async def get_by_email(
         self,
@@ -107,16 +118,34 @@ class UserService:
                 {"$set": flattened_updates},
                 return_document=ReturnDocument.AFTER,
             )
+            shared_cache.invalidate_user(user_id)
         else:
             document = await db[USERS_COLLECTION].find_one({"_id": ObjectId(user_id)})
         if document is None:
             return None
         return serialize_user(document)
 
+    async def update_password_hash(
+        self,
+        db: AsyncIOMotorDatabase,
+        user_id: str,
+        current_hash: str,
+        new_hash: str,
+    ) -> bool:
+        if not ObjectId.is_valid(user_id):
+            return False
+        # Matching on the old hash keeps a concurrent password change from being overwritten
+        result = await db[USERS_COLLECTION].update_one(
+            {"_id": ObjectId(user_id), "password_hash": current_hash},
+            {"$set": {"password_hash": new_hash}},
+        )
+        return result.modified_count == 1
+
     async def delete_user(self, db: AsyncIOMotorDatabase, user_id: str) -> bool:
         if not ObjectId.is_valid(user_id):
             return False
         result = await db[USERS_COLLECTION].delete_one({"_id": ObjectId(user_id)})
+        shared_cache.invalidate_user(user_id)
         return result.deleted_count == 1
 
     @staticmethod
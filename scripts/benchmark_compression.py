@@ -0,0 +1,108 @@
+"""Compare CPU time against compressed size for each response encoding and level.
+
+Run with ``python scripts/benchmark_compression.py``. Payloads mimic a fully
+populated profile response and a larger list of profiles standing in for
+future analysis results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Callable
+
+try:
+    import brotli as _brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    _brotli = None
+
+try:
+    import zstandard as _zstd  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    _zstd = None
+
+_TEXT = (
+    "Patient reports intermittent headaches and difficulty concentrating in the afternoons. "
+    "Sleep is fragmented with frequent waking around 3am; no history of head trauma. "
+)
+
+
+def _profile(index: int) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    long_text = (_TEXT * 12)[:2000]
+    return {
+        "id": f"65f0c0ffee{index:014d}",
+        "email": f"user{index}@example.com",
+        "personal_info": {"full_name": f"User {index}", "date_of_birth": "1990-01-01T00:00:00Z", "gender": "female"},
+        "clinical_info": {
+            "current_occupation": "Engineer",
+            "highest_education_level": "Master's degree",
+            "primary_concerns": long_text,
+            "symptom_onset_age": 27,
+        },
+        "medical_info": {
+            "relevant_history": long_text,
+            "current_medications": long_text,
+            "family_history": long_text,
+            "sleep_patterns": long_text,
+        },
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _payloads() -> dict[str, bytes]:
+    return {
+        "profile": json.dumps(_profile(0)).encode(),
+        "profiles_x200": json.dumps([_profile(i) for i in range(200)]).encode(),
+    }
+
+
+def _codecs() -> dict[str, tuple[range, Callable[[bytes, int], bytes]]]:
+    codecs: dict[str, tuple[range, Callable[[bytes, int], bytes]]] = {
+        "gzip": (range(1, 10), lambda data, level: zlib.compress(data, level, wbits=31)),
+    }
+    if _brotli is not None:
+        codecs["br"] = (range(0, 12), lambda data, level: _brotli.compress(data, quality=level))
+    if _zstd is not None:
+        contexts: dict[int, object] = {}
+
+        def _zstd_compress(data: bytes, level: int) -> bytes:
+            context = contexts.setdefault(level, _zstd.ZstdCompressor(level=level))
+            return context.compress(data)  # type: ignore[attr-defined]
+
+        codecs["zstd"] = (range(1, 20), _zstd_compress)
+    return codecs
+
+
+def _measure(compress: Callable[[bytes, int], bytes], data: bytes, level: int, repeat: int) -> tuple[int, float]:
+    size = len(compress(data, level))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        compress(data, level)
+    return size, (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50, help="Compressions per measurement")
+    args = parser.parse_args()
+
+    print(f"{'payload':<14} {'encoding':<8} {'level':>5} {'bytes':>9} {'ratio':>6} {'us/op':>10} {'MB/s':>8}")
+    for payload_name, data in _payloads().items():
+        print(f"{payload_name:<14} {'identity':<8} {'-':>5} {len(data):>9} {1.0:>6.2f} {0.0:>10.1f} {'-':>8}")
+        for encoding, (levels, compress) in _codecs().items():
+            for level in levels:
+                size, seconds = _measure(compress, data, level, args.repeat)
+                throughput = len(data) / seconds / 1_000_000
+                print(
+                    f"{payload_name:<14} {encoding:<8} {level:>5} {size:>9} "
+                    f"{len(data) / size:>6.2f} {seconds * 1_000_000:>10.1f} {throughput:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+
+# Settings are read at import time; provide the required values before any app module loads
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("PASSWORD_HASH_CALIBRATE_ON_STARTUP", "false")
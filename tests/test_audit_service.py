@@ -0,0 +1,262 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from app.db.models import AUDIT_LOG_COLLECTION
+from app.services.audit_service import (
+    AUDIT_LOGIN_FAILED,
+    AUDIT_LOGIN_SUCCEEDED,
+    AUDIT_PROFILE_DELETED,
+    AUDIT_PROFILE_READ,
+    AUDIT_PROFILE_UPDATED,
+    AuditLogWriter,
+)
+
+
+class FakeCollection:
+    def __init__(self, failures: int = 0) -> None:
+        self.documents: list[dict] = []
+        self.batches: list[int] = []
+        self.failures = failures
+
+    async def insert_many(self, documents, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("primary stepped down")
+        self.batches.append(len(documents))
+        for document in documents:
+            document.setdefault("_id", len(self.documents))
+            self.documents.append(document)
+
+
+def make_writer(**overrides) -> AuditLogWriter:
+    options = dict(
+        max_size=10,
+        batch_size=3,
+        flush_interval=0.01,
+        overflow_policy="drop_oldest",
+        shutdown_timeout=2.0,
+        max_flush_attempts=0,
+        retry_backoff=0.01,
+        max_retry_backoff=0.02,
+    )
+    options.update(overrides)
+    return AuditLogWriter(**options)
+
+
+def test_flushes_in_batches_and_drains_on_stop():
+    async def scenario():
+        collection = FakeCollection()
+        writer = make_writer()
+        await writer.start({AUDIT_LOG_COLLECTION: collection})
+        for index in range(7):
+            await writer.record("profile.read", user_id=str(index))
+        await writer.stop()
+        return collection, writer.metrics()
+
+    collection, metrics = asyncio.run(scenario())
+
+    assert [entry["user_id"] for entry in collection.documents] == [str(index) for index in range(7)]
+    assert max(collection.batches) <= 3
+    assert metrics["events_written"] == 7
+    assert metrics["queue_depth"] == 0
+    assert metrics["flushes"] == len(collection.batches)
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [("drop_oldest", ["2", "3", "4"]), ("drop_newest", ["0", "1", "2"])],
+)
+def test_overflow_policy(policy, expected):
+    async def scenario():
+        collection = FakeCollection()
+        writer = make_writer(max_size=3, overflow_policy=policy)
+        await writer.start({AUDIT_LOG_COLLECTION: collection})
+        # The writer task has not run yet, so every event stays queued
+        for index in range(5):
+            await writer.record("auth.login.succeeded", user_id=str(index))
+        await writer.stop()
+        return collection, writer.metrics()
+
+    collection, metrics = asyncio.run(scenario())
+
+    assert [entry["user_id"] for entry in collection.documents] == expected
+    assert metrics["events_dropped"] == 2
+
+
+def test_failed_flush_is_retried_until_written():
+    async def scenario():
+        collection = FakeCollection(failures=3)
+        writer = make_writer()
+        await writer.start({AUDIT_LOG_COLLECTION: collection})
+        await writer.record("profile.updated", user_id="1")
+        await writer.stop()
+        return collection, writer.metrics()
+
+    collection, metrics = asyncio.run(scenario())
+
+    assert len(collection.documents) == 1
+    assert metrics["flush_retries"] == 3
+    assert metrics["events_failed"] == 0
+
+
+def test_failed_flush_is_discarded_after_max_attempts():
+    async def scenario():
+        collection = FakeCollection(failures=5)
+        writer = make_writer(max_flush_attempts=2)
+        await writer.start({AUDIT_LOG_COLLECTION: collection})
+        await writer.record("profile.deleted", user_id="1")
+        await writer.stop()
+        return collection, writer.metrics()
+
+    collection, metrics = asyncio.run(scenario())
+
+    assert collection.documents == []
+    assert metrics["events_failed"] == 1
+
+
+def test_duplicate_key_errors_on_retry_count_as_written():
+    class PartiallyWrittenCollection(FakeCollection):
+        async def insert_many(self, documents, ordered=True):
+            raise BulkWriteError({"writeErrors": [{"code": 11000, "index": 0}], "writeConcernErrors": []})
+
+    async def scenario():
+        writer = make_writer()
+        await writer.start({AUDIT_LOG_COLLECTION: PartiallyWrittenCollection()})
+        await writer.record("profile.read", user_id="1")
+        await writer.stop()
+        return writer.metrics()
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["events_written"] == 1
+    assert metrics["flush_retries"] == 0
+
+
+class RecordingWriter:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, str | None]] = []
+
+    async def record(self, event, *, user_id=None, **details):
+        self.events.append((event, user_id))
+
+
+USER = {
+    "id": "65f0c0ffee00000000000001",
+    "email": "ada@example.com",
+    "created_at": "2024-01-01T00:00:00Z",
+    "updated_at": "2024-01-01T00:00:00Z",
+}
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    from app.api import profile
+    from app.services import auth_service
+
+    writer = RecordingWriter()
+    monkeypatch.setattr(profile, "audit_writer", writer)
+    monkeypatch.setattr(auth_service, "audit_writer", writer)
+    return writer
+
+
+@pytest.fixture
+def profile_client(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.api import profile
+    from app.core.security import get_current_user
+    from app.db.session import get_database
+    from app.main import create_app
+
+    async def update_user(db, user_id, payload):
+        return USER
+
+    async def delete_user(db, user_id):
+        return True
+
+    monkeypatch.setattr(profile._user_service, "update_user", update_user)
+    monkeypatch.setattr(profile._user_service, "delete_user", delete_user)
+    app = create_app()
+    app.dependency_overrides[get_current_user] = lambda: USER
+    app.dependency_overrides[get_database] = lambda: object()
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("method", "expected"),
+    [
+        ("get", AUDIT_PROFILE_READ),
+        ("put", AUDIT_PROFILE_UPDATED),
+        ("delete", AUDIT_PROFILE_DELETED),
+    ],
+)
+def test_profile_routes_record_audit_events(recorder, profile_client, method, expected):
+    kwargs = {"json": {"personal_info": {"full_name": "Ada"}}} if method == "put" else {}
+
+    response = getattr(profile_client, method)("/profile/me", **kwargs)
+
+    assert response.status_code == 200
+    assert recorder.events == [(expected, USER["id"])]
+
+
+@pytest.mark.parametrize(
+    ("password", "expected"),
+    [("Passw0rd!", AUDIT_LOGIN_SUCCEEDED), ("wrong-password", AUDIT_LOGIN_FAILED)],
+)
+def test_login_records_audit_event(recorder, monkeypatch, password, expected):
+    from fastapi import HTTPException
+    from passlib.hash import pbkdf2_sha256
+
+    from app.core.security import pwd_context
+    from app.schemas.auth import LoginRequest
+    from app.services.auth_service import AuthService
+
+    rounds = pwd_context.handler("pbkdf2_sha256").default_rounds
+    stored = {**USER, "password_hash": pbkdf2_sha256.using(rounds=rounds).hash("Passw0rd!")}
+    service = AuthService()
+
+    async def get_by_email(db, email, include_password=False):
+        return stored
+
+    monkeypatch.setattr(service.user_service, "get_by_email", get_by_email)
+
+    async def scenario():
+        try:
+            await service.authenticate_user(object(), LoginRequest(email=USER["email"], password=password))
+        except HTTPException as exc:
+            assert exc.status_code == 401
+
+    asyncio.run(scenario())
+
+    assert recorder.events == [(expected, USER["id"])]
+
+
+def test_metrics_endpoint_is_hidden_without_token(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+    from app.main import create_app
+
+    monkeypatch.setattr(settings, "metrics_token", None)
+
+    response = TestClient(create_app()).get("/metrics/audit", headers={"Authorization": "Bearer anything"})
+
+    assert response.status_code == 404
+
+
+def test_metrics_endpoint_requires_token(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+    from app.main import create_app
+
+    monkeypatch.setattr(settings, "metrics_token", "scrape-me")
+    client = TestClient(create_app())
+
+    assert client.get("/metrics/audit").status_code == 401
+    assert client.get("/metrics/audit", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics/audit", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
+    assert {"queue_depth", "events_dropped", "avg_flush_latency_ms"} <= response.json().keys()
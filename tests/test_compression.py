@@ -0,0 +1,171 @@
+import asyncio
+import gzip
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, available_encodings, negotiate_encoding
+
+CHUNK_SIZE = 1024
+LARGE_BODY = bytes(range(256)) * 40  # 10 KiB, several chunks
+
+
+def make_client(minimum_size: int = 100) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size, chunk_size=CHUNK_SIZE)
+
+    @app.get("/small")
+    def small() -> dict:
+        return {"ok": True}
+
+    @app.get("/large")
+    def large() -> Response:
+        return Response(LARGE_BODY, media_type="application/octet-stream")
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        def parts():
+            yield LARGE_BODY[:3000]
+            yield b""
+            yield LARGE_BODY[3000:]
+
+        return StreamingResponse(parts(), media_type="application/octet-stream")
+
+    @app.get("/image")
+    def image() -> Response:
+        return Response(LARGE_BODY, media_type="image/png")
+
+    @app.get("/empty")
+    def empty() -> Response:
+        return Response(b"", media_type="application/json")
+
+    @app.get("/no-content", status_code=204)
+    def no_content() -> Response:
+        return Response(status_code=204)
+
+    @app.get("/not-modified")
+    def not_modified() -> Response:
+        return Response(status_code=304, media_type="application/json")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("gzip, br, zstd", "zstd"),
+        ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+        ("*", "zstd"),
+        ("gzip;q=0, *", "zstd"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, ("zstd", "br", "gzip")) == expected
+
+
+def test_small_bodies_are_not_compressed():
+    response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+
+def decompress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        import brotli
+
+        return brotli.decompress(body)
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return gzip.decompress(body)
+
+
+def run_asgi(bodies: list[bytes], *, encoding: str, more_body_last: bool = False) -> list[dict]:
+    """Send ``bodies`` as successive ASGI body messages through the middleware and collect the output."""
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        for index, body in enumerate(bodies):
+            more_body = index < len(bodies) - 1 or more_body_last
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    middleware = CompressionMiddleware(app, minimum_size=100, chunk_size=CHUNK_SIZE)
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", encoding.encode())]}
+    messages: list[dict] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return messages
+
+
+@pytest.mark.parametrize("encoding", available_encodings())
+@pytest.mark.parametrize(
+    "bodies",
+    [[LARGE_BODY], [LARGE_BODY[:3000], b"", LARGE_BODY[3000:]], [LARGE_BODY[:CHUNK_SIZE], LARGE_BODY[CHUNK_SIZE:]]],
+    ids=["single", "streamed", "chunk-aligned"],
+)
+def test_large_bodies_are_compressed_in_chunks(encoding, bodies):
+    start, *body_messages = run_asgi(bodies, encoding=encoding)
+    headers = dict(start["headers"])
+
+    assert headers[b"content-encoding"] == encoding.encode()
+    assert b"content-length" not in headers
+    assert len(body_messages) >= len(LARGE_BODY) // CHUNK_SIZE
+    assert all(message["more_body"] for message in body_messages[:-1])
+    assert body_messages[-1]["more_body"] is False
+    assert decompress(encoding, b"".join(message["body"] for message in body_messages)) == LARGE_BODY
+
+
+@pytest.mark.parametrize("encoding", available_encodings())
+def test_body_within_one_chunk_gets_content_length(encoding):
+    body = LARGE_BODY[:CHUNK_SIZE]
+    start, message = run_asgi([body], encoding=encoding)
+    headers = dict(start["headers"])
+
+    assert headers[b"content-encoding"] == encoding.encode()
+    assert int(headers[b"content-length"]) == len(message["body"])
+    assert decompress(encoding, message["body"]) == body
+
+
+def test_zstd_contexts_are_reused_between_responses():
+    pytest.importorskip("zstandard")
+    middleware = CompressionMiddleware(lambda *args: None, zstd_level=3)
+    first = middleware.open_stream("zstd")
+    first.compress(b"data")
+    first.finish()
+    second = middleware.open_stream("zstd")
+
+    assert second._context is first._context
+
+
+def test_incompressible_media_types_pass_through():
+    response = make_client().get("/image", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.content == LARGE_BODY
+
+
+@pytest.mark.parametrize("path", ["/empty", "/no-content", "/not-modified"])
+def test_bodyless_responses_are_never_encoded(path):
+    response = make_client(minimum_size=0).get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.content == b""
+
+
+def test_head_requests_are_not_encoded():
+    response = make_client(minimum_size=0).head("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
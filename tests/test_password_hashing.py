@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+
+import bcrypt
+import pytest
+from bson import ObjectId
+from passlib.hash import pbkdf2_sha256
+
+from app.core import hash_calibration
+from app.core.security import configure_password_hashing, password_needs_rehash, pwd_context
+from app.db.models import USERS_COLLECTION
+from app.schemas.auth import LoginRequest
+from app.services.auth_service import AuthService, drain_rehash_tasks
+
+PASSWORD = "Passw0rd!"
+
+
+def test_calibration_result_is_reused_per_node(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_calibrate(target_ms, *, min_rounds, max_rounds=None):
+        calls.append(target_ms)
+        return 420_000
+
+    monkeypatch.setattr(hash_calibration, "calibrate_pbkdf2_rounds", fake_calibrate)
+    cache_file = tmp_path / "rounds.json"
+
+    first = hash_calibration.load_or_calibrate(cache_file, 250.0, min_rounds=310_000)
+    second = hash_calibration.load_or_calibrate(cache_file, 250.0, min_rounds=310_000)
+    changed_budget = hash_calibration.load_or_calibrate(cache_file, 100.0, min_rounds=310_000)
+
+    assert first == (420_000, False)
+    assert second == (420_000, True)
+    assert changed_budget == (420_000, False)
+    assert calls == [250.0, 100.0]
+
+
+def test_outdated_and_legacy_hashes_need_rehash():
+    original = pwd_context.to_dict()
+    current_rounds = pwd_context.handler("pbkdf2_sha256").default_rounds
+    legacy = bcrypt.hashpw(b"Passw0rd!", bcrypt.gensalt(4)).decode()
+    weak = pbkdf2_sha256.using(rounds=1000).hash("Passw0rd!")
+    pwd_context.update(pbkdf2_sha256__min_rounds=current_rounds)
+    try:
+        assert password_needs_rehash(legacy)
+        assert password_needs_rehash(weak)
+        assert not password_needs_rehash(pbkdf2_sha256.using(rounds=current_rounds).hash("Passw0rd!"))
+    finally:
+        pwd_context.load(original)
+
+
+def test_max_rounds_never_lowers_the_floor(monkeypatch):
+    monkeypatch.setattr(hash_calibration, "measure_pbkdf2_ms", lambda rounds, samples: 10_000.0)
+
+    assert hash_calibration.calibrate_pbkdf2_rounds(250.0, min_rounds=310_000, max_rounds=400_000) == 310_000
+    with pytest.raises(ValueError):
+        hash_calibration.calibrate_pbkdf2_rounds(250.0, min_rounds=310_000, max_rounds=100_000)
+
+
+class FakeUsers:
+    def __init__(self, document: dict) -> None:
+        self.document = document
+        self.updates: list[tuple[dict, dict]] = []
+
+    async def find_one(self, query):
+        return self.document if query.get("email") == self.document["email"] else None
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+        return SimpleNamespace(modified_count=1)
+
+
+@pytest.fixture
+def configured_context():
+    original = pwd_context.to_dict()
+    rounds, _ = configure_password_hashing()
+    yield rounds
+    pwd_context.load(original)
+
+
+@pytest.mark.parametrize(
+    ("stored_hash", "rehashed"),
+    [
+        (lambda rounds: bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(4)).decode(), True),
+        (lambda rounds: pbkdf2_sha256.using(rounds=1000).hash(PASSWORD), True),
+        (lambda rounds: pbkdf2_sha256.using(rounds=rounds).hash(PASSWORD), False),
+    ],
+    ids=["legacy-bcrypt", "low-rounds", "current"],
+)
+def test_login_rehashes_outdated_password_once(configured_context, stored_hash, rehashed):
+    old_hash = stored_hash(configured_context)
+    user_id = ObjectId()
+    users = FakeUsers(
+        {"_id": user_id, "email": "ada@example.com", "password_hash": old_hash, "created_at": None, "updated_at": None}
+    )
+
+    async def scenario():
+        await AuthService().authenticate_user(
+            {USERS_COLLECTION: users}, LoginRequest(email="ada@example.com", password=PASSWORD)
+        )
+        await drain_rehash_tasks()
+
+    asyncio.run(scenario())
+
+    if not rehashed:
+        assert users.updates == []
+        return
+    assert len(users.updates) == 1
+    query, update = users.updates[0]
+    assert query == {"_id": user_id, "password_hash": old_hash}
+    new_hash = update["$set"]["password_hash"]
+    assert update == {"$set": {"password_hash": new_hash}}
+    assert pwd_context.verify(PASSWORD, new_hash)
+    assert not password_needs_rehash(new_hash)
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.shared_cache import SharedCache
+
+USER_ID = "65f0c0ffee00000000000001"
+USER = {"id": USER_ID, "email": "user@example.com", "created_at": datetime(2024, 1, 1)}
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two caches on the same directory stand in for two uvicorn workers."""
+    caches = [SharedCache(), SharedCache()]
+    for cache in caches:
+        cache.open(str(tmp_path), refresh_seconds=0.5, user_ttl_seconds=60.0, user_slots=1024)
+    yield caches
+    for cache in caches:
+        asyncio.run(cache.close())
+
+
+class FakeCursor:
+    def __init__(self, documents, on_next=None):
+        self.documents = documents
+        self.on_next = on_next
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                if self.on_next is not None:
+                    self.on_next()
+                yield document
+
+        return iterate()
+
+
+class FakeBlacklist:
+    def __init__(self, jtis, on_next=None):
+        self.documents = [{"jti": jti, "created_at": datetime.now(timezone.utc)} for jti in jtis]
+        self.on_next = on_next
+        self.queries = []
+
+    def add(self, jti):
+        self.documents.append({"jti": jti, "created_at": datetime.now(timezone.utc)})
+
+    def find(self, query, projection):
+        self.queries.append(query)
+        since = query.get("created_at", {}).get("$gte")
+        documents = [
+            {"jti": document["jti"]}
+            for document in self.documents
+            if since is None or document["created_at"] >= since
+        ]
+        return FakeCursor(documents, self.on_next)
+
+
+def test_user_snapshot_is_shared_between_workers(workers):
+    first, second = workers
+    first.store_user(USER_ID, USER, first.user_generation(USER_ID))
+
+    assert second.get_user(USER_ID) == USER
+
+
+def test_invalidation_is_seen_by_other_workers(workers):
+    first, second = workers
+    first.store_user(USER_ID, USER, first.user_generation(USER_ID))
+
+    second.invalidate_user(USER_ID)
+
+    assert first.get_user(USER_ID) is None
+
+
+def test_snapshot_read_before_an_update_is_never_served(workers):
+    first, second = workers
+    generation = first.user_generation(USER_ID)
+    second.invalidate_user(USER_ID)  # update lands while the first worker is still reading Mongo
+
+    first.store_user(USER_ID, USER, generation)
+
+    assert second.get_user(USER_ID) is None
+
+
+def test_snapshots_expire_after_ttl(workers):
+    first, second = workers
+    second.user_ttl_seconds = 0.05
+    first.store_user(USER_ID, USER, first.user_generation(USER_ID))
+    time.sleep(0.1)
+
+    assert second.get_user(USER_ID) is None
+
+
+def test_sweep_removes_expired_snapshots(workers, tmp_path):
+    first, _ = workers
+    first.store_user(USER_ID, USER, first.user_generation(USER_ID))
+    fresh_id = "65f0c0ffee00000000000002"
+    first.store_user(fresh_id, {**USER, "id": fresh_id}, first.user_generation(fresh_id))
+    expired = tmp_path / "users" / f"{USER_ID}.bson"
+    old = time.time() - 120
+    os.utime(expired, (old, old))
+
+    assert first.sweep_users() == 1
+    assert not expired.exists()
+    assert first.get_user(fresh_id) is not None
+
+
+def test_revocations_are_shared_and_merged_without_rescan(workers):
+    first, second = workers
+    blacklist = FakeBlacklist(["a", "b"])
+    asyncio.run(first.refresh_revocations({"token_blacklist": blacklist}, force=True))
+
+    assert [second.is_revoked(jti) for jti in "abc"] == [True, True, False]
+
+    first.add_revocation("c")
+    second._revocations_checked_at = 0.0
+
+    assert second.is_revoked("c") is True
+    assert second.is_revoked("d") is False
+    assert len(blacklist.queries) == 1
+
+
+def test_refresh_reads_only_new_entries_and_rebuilds_periodically(workers):
+    first, second = workers
+    blacklist = FakeBlacklist(["a", "b"])
+    asyncio.run(first.refresh_revocations({"token_blacklist": blacklist}, force=True))
+    blacklist.add("c")
+    asyncio.run(first.refresh_revocations({"token_blacklist": blacklist}, force=True))
+
+    assert "created_at" not in blacklist.queries[0]
+    assert "created_at" in blacklist.queries[1]
+    assert [second.is_revoked(jti) for jti in "abc"] == [True, True, True]
+
+    # "a" expired and left the blacklist; only a rebuild drops it
+    blacklist.documents = [document for document in blacklist.documents if document["jti"] != "a"]
+    first.revocation_rebuild_seconds = 0.0
+    asyncio.run(first.refresh_revocations({"token_blacklist": blacklist}, force=True))
+    second._revocations_checked_at = 0.0
+
+    assert "created_at" not in blacklist.queries[2]
+    assert [second.is_revoked(jti) for jti in "abc"] == [False, True, True]
+
+
+@pytest.mark.parametrize("rebuild", [False, True], ids=["incremental", "rebuild"])
+def test_logout_during_refresh_is_not_lost(workers, rebuild):
+    first, second = workers
+    asyncio.run(first.refresh_revocations({"token_blacklist": FakeBlacklist(["a"])}, force=True))
+    first.revocation_rebuild_seconds = 0.0 if rebuild else 3600.0
+    # Another worker logs out while this one is still reading Mongo
+    blacklist = FakeBlacklist(["b"], on_next=lambda: second.add_revocation("c"))
+    asyncio.run(first.refresh_revocations({"token_blacklist": blacklist}, force=True))
+    second._revocations_checked_at = 0.0
+
+    assert second.is_revoked("b") is True
+    assert second.is_revoked("c") is True
+
+
+def test_stale_revocation_set_falls_back_to_mongo(workers):
+    first, second = workers
+    asyncio.run(first.refresh_revocations({"token_blacklist": FakeBlacklist([])}, force=True))
+    second.refresh_seconds = 0.01
+    time.sleep(0.05)
+    second._revocations_checked_at = 0.0
+
+    assert second.is_revoked("a") is None
+
+
+def test_artifacts_are_built_once_per_version(workers, tmp_path):
+    first, second = workers
+    builds = []
+
+    def build(payload):
+        def run():
+            builds.append(payload)
+            return payload
+
+        return run
+
+    assert bytes(first.artifact("weights", "v1", build(b"one"))) == b"one"
+    assert bytes(second.artifact("weights", "v1", build(b"never"))) == b"one"
+    assert bytes(second.artifact("weights", "v2", build(b"two"))) == b"two"
+    assert builds == [b"one", b"two"]
+    assert not list(tmp_path.glob("artifact-weights@v1.snap"))
+
+
+def test_disabled_cache_is_a_no_op():
+    cache = SharedCache()
+
+    assert cache.get_user(USER_ID) is None
+    assert cache.is_revoked("a") is None
+    assert bytes(cache.artifact("weights", "v1", lambda: b"local")) == b"local"